@@ -15,23 +15,34 @@ Environment Variables:
     AWS_SECRET_ACCESS_KEY: AWS secret key
     AWS_REGION: AWS region (default: us-east-1)
     S3_BUCKET_NAME: Target S3 bucket name
+    SYNC_WORKERS: Number of concurrent download/upload workers (default: 16)
 """
 
 import os
 import sys
+import time
 import logging
 import hashlib
 import tempfile
 import argparse
+import mmap
 import shutil
+import sqlite3
+import functools
+import itertools
+import threading
+import concurrent.futures
+import mimetypes
+from collections import defaultdict
 from datetime import datetime
-from pathlib import Path
-from typing import Optional, Set, Dict, Any
+from typing import Optional, Set, Dict, Tuple
 import json
 
 try:
     from pyicloud import PyiCloudService
     import boto3
+    from boto3.s3.transfer import TransferConfig
+    from botocore.config import Config
     from botocore.exceptions import ClientError, NoCredentialsError
 except ImportError as e:
     print(f"Missing required package: {e}")
@@ -45,16 +56,109 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Content types for the extensions iCloud photo libraries actually contain;
+# built once at import time instead of per call
+_CONTENT_TYPES = {
+    '.jpg': 'image/jpeg',
+    '.jpeg': 'image/jpeg',
+    '.png': 'image/png',
+    '.gif': 'image/gif',
+    '.bmp': 'image/bmp',
+    '.tiff': 'image/tiff',
+    '.webp': 'image/webp',
+    '.heic': 'image/heic',
+    '.heif': 'image/heif',
+    '.mp4': 'video/mp4',
+    '.mov': 'video/quicktime',
+    '.avi': 'video/x-msvideo',
+}
+
+
+# Downloads above this size skip the RAM-backed temp dir so they can't
+# exhaust shared memory
+_LARGE_FILE_BYTES = 200 * 1024 * 1024
+
+
+@functools.lru_cache(maxsize=None)
+def _content_type_for(ext: str) -> str:
+    """Content type for a lowercased extension, cached per distinct extension."""
+    content_type = _CONTENT_TYPES.get(ext)
+    if content_type is None and ext:
+        # Unusual extension - let the stdlib table have a go
+        content_type = mimetypes.guess_type('f' + ext)[0]
+    return content_type or 'application/octet-stream'
+
+
+@functools.lru_cache(maxsize=None)
+def _month_prefix(year: int, month: int) -> str:
+    """S3 prefix for a year/month - formatted once per month, not per photo."""
+    return f"photos/{year}/{month:02d}"
+
+
+def _digest_id(photo_id: str) -> int:
+    """Compact 64-bit digest of a photo id for in-memory membership tests.
+
+    Full ids live in the state database; in memory, 8-byte ints keep the
+    working set small for very large libraries (collision odds at 64 bits
+    are negligible).
+    """
+    return int.from_bytes(hashlib.blake2b(photo_id.encode(), digest_size=8).digest(), 'big')
+
+
+class _HashingStream:
+    """File-like wrapper that hashes bytes as they pass through a read().
+
+    Lets upload_fileobj consume the iCloud HTTP response stream directly while
+    the content hash is computed in the same pass (no temp file needed).
+    """
+
+    def __init__(self, raw):
+        self._raw = raw
+        self._hasher = hashlib.blake2b(digest_size=16)
+        self.hash_seconds = 0.0
+
+    def read(self, size=-1):
+        chunk = self._raw.read(size)
+        if chunk:
+            start = time.perf_counter()
+            self._hasher.update(chunk)
+            self.hash_seconds += time.perf_counter() - start
+        return chunk
+
+    def hexdigest(self) -> str:
+        return self._hasher.hexdigest()
+
+
 class iCloudS3Sync:
     def __init__(self, storage_class: str, local_path: Optional[str] = None):
         self.icloud = None
         self.s3_client = None
         self.bucket_name = None
-        self.processed_files: Set[str] = set()
-        self.state_file = "sync_state.json"
+        self.processed_files: Set[int] = set()
+        self.photo_versions: Dict[int, Tuple[Optional[str], Optional[int], Optional[str]]] = {}
+        self.existing_keys: Dict[str, str] = {}
+        self.state_file = "sync_state.db"
+        self.state_db = None
         self.storage_class = storage_class
         self.local_path = local_path
-        
+        self.max_workers = int(os.getenv('SYNC_WORKERS', '16'))
+        self.state_lock = threading.Lock()
+
+        # Total time spent in hash updates across all workers - tells us
+        # whether hashing is ever worth optimizing further (it's normally
+        # dwarfed by network I/O). Plain += is fine; a lost fraction of a
+        # millisecond under contention doesn't matter for a diagnostic.
+        self.hash_seconds = 0.0
+
+        # Multipart upload with concurrent parts - matters for large videos,
+        # which otherwise upload serially and leave bandwidth on the table
+        self.transfer_config = TransferConfig(
+            multipart_threshold=16 * 1024 * 1024,
+            multipart_chunksize=16 * 1024 * 1024,
+            max_concurrency=10,
+            use_threads=True
+        )
+
         # Create local directory if specified
         if self.local_path:
             os.makedirs(self.local_path, exist_ok=True)
@@ -108,18 +212,32 @@ class iCloudS3Sync:
                   aws_access_key: Optional[str] = None,
                   aws_secret_key: Optional[str] = None,
                   region: str = 'us-east-1') -> bool:
-        """Initialize S3 client."""
+        """Initialize S3 client (shared across worker threads - boto3 clients are thread-safe)."""
         try:
+            # Size the connection pool for worker threads times concurrent
+            # multipart parts so parallel uploads don't hit "Connection pool
+            # is full" warnings
+            pool_size = max(10, self.max_workers * self.transfer_config.max_concurrency)
+            client_config = Config(
+                max_pool_connections=pool_size,
+                # Back off with jitter on SlowDown/503 instead of failing photos
+                retries={'mode': 'adaptive', 'max_attempts': 10},
+                # Keep long-lived connections warm - a TLS handshake per
+                # request costs 50-200 ms on high-latency links
+                tcp_keepalive=True
+            )
+
             if aws_access_key and aws_secret_key:
                 self.s3_client = boto3.client(
                     's3',
                     aws_access_key_id=aws_access_key,
                     aws_secret_access_key=aws_secret_key,
-                    region_name=region
+                    region_name=region,
+                    config=client_config
                 )
             else:
                 # Use default credentials (IAM role, credentials file, etc.)
-                self.s3_client = boto3.client('s3', region_name=region)
+                self.s3_client = boto3.client('s3', region_name=region, config=client_config)
             
             self.bucket_name = bucket_name
             
@@ -144,108 +262,213 @@ class iCloudS3Sync:
             logger.error(f"Failed to setup S3: {e}")
             return False
     
-    def load_sync_state(self) -> Dict[str, Any]:
-        """Load previous sync state from file."""
-        if os.path.exists(self.state_file):
-            try:
-                with open(self.state_file, 'r') as f:
-                    state = json.load(f)
-                    self.processed_files = set(state.get('processed_files', []))
-                    logger.info(f"Loaded sync state: {len(self.processed_files)} processed files")
-                    return state
-            except Exception as e:
-                logger.warning(f"Could not load sync state: {e}")
-        return {}
-    
-    def save_sync_state(self):
-        """Save current sync state to file."""
+    def load_sync_state(self):
+        """Open the sync state database and load processed photo ids.
+
+        SQLite with WAL gives O(1) durable inserts per photo, instead of
+        rewriting the whole JSON state (O(N)) every 10 photos.
+        """
         try:
-            state = {
-                'processed_files': list(self.processed_files),
-                'last_sync': datetime.now().isoformat()
-            }
-            with open(self.state_file, 'w') as f:
-                json.dump(state, f, indent=2)
-            logger.info("Sync state saved")
+            self.state_db = sqlite3.connect(self.state_file, check_same_thread=False)
+            self.state_db.execute("PRAGMA journal_mode=WAL")
+            self.state_db.execute(
+                "CREATE TABLE IF NOT EXISTS processed "
+                "(photo_id TEXT PRIMARY KEY, synced_at TEXT, version TEXT, "
+                "size INTEGER, content_hash TEXT)"
+            )
+            # Older databases predate the version and hash columns
+            for column in ('version TEXT', 'size INTEGER', 'content_hash TEXT'):
+                try:
+                    self.state_db.execute(f"ALTER TABLE processed ADD COLUMN {column}")
+                except sqlite3.OperationalError:
+                    pass
+            self._migrate_json_state()
+            rows = self.state_db.execute(
+                "SELECT photo_id, version, size, content_hash FROM processed"
+            ).fetchall()
+            self.processed_files = {_digest_id(row[0]) for row in rows}
+            self.photo_versions = {_digest_id(row[0]): (row[1], row[2], row[3]) for row in rows}
+            logger.info(f"Loaded sync state: {len(self.processed_files)} processed files")
+        except Exception as e:
+            logger.warning(f"Could not load sync state: {e}")
+
+    def _migrate_json_state(self):
+        """Import processed ids from a legacy sync_state.json, if present."""
+        legacy_file = "sync_state.json"
+        if not os.path.exists(legacy_file):
+            return
+        try:
+            with open(legacy_file, 'r') as f:
+                state = json.load(f)
+            last_sync = state.get('last_sync', '')
+            self.state_db.executemany(
+                "INSERT OR IGNORE INTO processed (photo_id, synced_at) VALUES (?, ?)",
+                [(photo_id, last_sync) for photo_id in state.get('processed_files', [])]
+            )
+            self.state_db.commit()
+            os.rename(legacy_file, legacy_file + '.migrated')
+            logger.info(f"Migrated legacy sync state from {legacy_file}")
         except Exception as e:
-            logger.warning(f"Could not save sync state: {e}")
+            logger.warning(f"Could not migrate legacy sync state: {e}")
+
+    def mark_processed(self, photo_id: str, version: Optional[str] = None,
+                       size: Optional[int] = None, content_hash: Optional[str] = None):
+        """Record a synced photo in memory and durably in the state database."""
+        with self.state_lock:
+            photo_key = _digest_id(photo_id)
+            self.processed_files.add(photo_key)
+            self.photo_versions[photo_key] = (version, size, content_hash)
+            if self.state_db is not None:
+                self.state_db.execute(
+                    "INSERT OR REPLACE INTO processed "
+                    "(photo_id, synced_at, version, size, content_hash) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (photo_id, datetime.now().isoformat(), version, size, content_hash)
+                )
+                self.state_db.commit()
+
+    def _photo_version(self, photo) -> Optional[str]:
+        """Best-effort change marker for an iCloud photo."""
+        for attr in ('version_id', 'etag'):
+            value = getattr(photo, attr, None)
+            if value:
+                return str(value)
+        # pyicloud doesn't expose the CloudKit change tag as a property
+        record = getattr(photo, '_asset_record', None)
+        if record:
+            return record.get('recordChangeTag')
+        return None
     
     def get_file_hash(self, file_path: str) -> str:
-        """Calculate MD5 hash of a file."""
-        hash_md5 = hashlib.md5()
+        """Calculate BLAKE2b hash of a file.
+
+        hashlib.file_digest (3.11+) hashes the whole file in one C call; the
+        mmap fallback for older Pythons likewise hands the full buffer to the
+        hash in one update instead of a Python-level chunk loop.
+        """
         with open(file_path, "rb") as f:
-            for chunk in iter(lambda: f.read(4096), b""):
-                hash_md5.update(chunk)
-        return hash_md5.hexdigest()
-    
-    def file_exists_in_s3(self, s3_key: str, local_hash: str) -> bool:
-        """Check if file exists in S3 with same content (handles DeepArchive)."""
+            if hasattr(hashlib, 'file_digest'):
+                return hashlib.file_digest(f, lambda: hashlib.blake2b(digest_size=16)).hexdigest()
+
+            file_hash = hashlib.blake2b(digest_size=16)
+            if os.path.getsize(file_path):
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    file_hash.update(mm)
+            return file_hash.hexdigest()
+    
+    def _index_bucket(self):
+        """Build an in-memory {key: etag} index of the photos/ prefix.
+
+        One LIST page covers 1000 keys, so this replaces thousands of
+        per-photo HEAD round-trips with a handful of LIST calls.
+        """
+        logger.info("Indexing existing S3 objects under photos/ ...")
+        try:
+            paginator = self.s3_client.get_paginator('list_objects_v2')
+            self.existing_keys = {
+                obj['Key']: obj['ETag'].strip('"')
+                for page in paginator.paginate(Bucket=self.bucket_name, Prefix='photos/')
+                for obj in page.get('Contents', [])
+            }
+            logger.info(f"Indexed {len(self.existing_keys)} existing S3 objects")
+        except Exception as e:
+            logger.warning(f"Could not index S3 bucket: {e}")
+            self.existing_keys = {}
+
+    def file_exists_in_s3(self, s3_key: str, local_hash: Optional[str] = None) -> bool:
+        """Check if file exists in S3 with same content (handles DeepArchive).
+
+        Misses are answered from the bucket index built by _index_bucket (the
+        common case for new photos, at zero network cost). With no local_hash,
+        existence of the key is enough.
+        """
+        if s3_key not in self.existing_keys:
+            return False
+
+        if local_hash is None:
+            return True
+
+        # Key exists and the caller wants content verification. LIST doesn't
+        # return object metadata, so this rare path still needs one HEAD.
         try:
             response = self.s3_client.head_object(Bucket=self.bucket_name, Key=s3_key)
-            s3_etag = response.get('ETag', '').strip('"')
+            s3_hash = response.get('Metadata', {}).get('file-hash', '')
             storage_class = response.get('StorageClass', 'STANDARD')
-            
-            logger.debug(f"S3 object {s3_key}: StorageClass={storage_class}, ETag={s3_etag}")
-            
+
+            logger.debug("S3 object %s: StorageClass=%s, file-hash=%s", s3_key, storage_class, s3_hash)
+
             # For DeepArchive or Glacier, we mainly check if the object exists
-            # ETag comparison might not work perfectly with multipart uploads
             if storage_class in ['DEEP_ARCHIVE', 'GLACIER']:
-                logger.debug(f"File {s3_key} exists in {storage_class} - skipping")
+                logger.debug("File %s exists in %s - skipping", s3_key, storage_class)
                 return True
-            
-            # For other storage classes, compare ETag (might be MD5 hash)
-            return s3_etag == local_hash
+
+            # Compare against the hash we stored at upload time - the ETag is
+            # not a plain content hash for multipart uploads, so it can't be used
+            return s3_hash == local_hash
             
         except ClientError as e:
             if e.response['Error']['Code'] == '404':
                 return False
             else:
-                logger.warning(f"Error checking S3 object {s3_key}: {e}")
+                logger.warning("Error checking S3 object %s: %s", s3_key, e)
                 return False
     
     def upload_to_s3(self, local_path: str, s3_key: str, metadata: Dict[str, str] = None) -> bool:
         """Upload file to S3 with specified storage class."""
         try:
             extra_args = {
-                'ContentType': self.get_content_type(local_path),
+                'ContentType': self.get_content_type(s3_key),
                 'StorageClass': self.storage_class
             }
             if metadata:
                 extra_args['Metadata'] = metadata
             
-            logger.debug(f"Uploading with StorageClass: {self.storage_class}")
+            logger.debug("Uploading with StorageClass: %s", self.storage_class)
             
             self.s3_client.upload_file(
-                local_path, 
-                self.bucket_name, 
+                local_path,
+                self.bucket_name,
                 s3_key,
-                ExtraArgs=extra_args
+                ExtraArgs=extra_args,
+                Config=self.transfer_config
             )
-            logger.info(f"Uploaded to {self.storage_class}: {s3_key}")
+            logger.info("Uploaded to %s: %s", self.storage_class, s3_key)
             return True
             
         except Exception as e:
-            logger.error(f"Failed to upload {s3_key}: {e}")
+            logger.error("Failed to upload %s: %s", s3_key, e)
             return False
-    
+
+    def upload_stream_to_s3(self, fileobj, s3_key: str, metadata: Dict[str, str] = None) -> bool:
+        """Upload a file-like object to S3 without touching local disk."""
+        try:
+            extra_args = {
+                'ContentType': self.get_content_type(s3_key),
+                'StorageClass': self.storage_class
+            }
+            if metadata:
+                extra_args['Metadata'] = metadata
+
+            logger.debug("Streaming upload with StorageClass: %s", self.storage_class)
+
+            self.s3_client.upload_fileobj(
+                fileobj,
+                self.bucket_name,
+                s3_key,
+                ExtraArgs=extra_args,
+                Config=self.transfer_config
+            )
+            logger.info("Uploaded to %s: %s", self.storage_class, s3_key)
+            return True
+
+        except Exception as e:
+            logger.error("Failed to upload %s: %s", s3_key, e)
+            return False
+
     def get_content_type(self, filename: str) -> str:
         """Determine content type based on file extension."""
-        ext = Path(filename).suffix.lower()
-        content_types = {
-            '.jpg': 'image/jpeg',
-            '.jpeg': 'image/jpeg',
-            '.png': 'image/png',
-            '.gif': 'image/gif',
-            '.bmp': 'image/bmp',
-            '.tiff': 'image/tiff',
-            '.webp': 'image/webp',
-            '.heic': 'image/heic',
-            '.heif': 'image/heif',
-            '.mp4': 'video/mp4',
-            '.mov': 'video/quicktime',
-            '.avi': 'video/x-msvideo',
-        }
-        return content_types.get(ext, 'application/octet-stream')
+        # splitext ignores dots in directory components, unlike a raw rfind
+        return _content_type_for(os.path.splitext(filename)[1].lower())
     
     def generate_s3_key(self, photo, filename: str) -> str:
         """Generate S3 key with organized folder structure."""
@@ -257,49 +480,58 @@ class iCloudS3Sync:
             created_date = photo.asset_date
         
         if created_date:
-            year = created_date.year
-            month = f"{created_date.month:02d}"
-            s3_key = f"photos/{year}/{month}/{filename}"
+            s3_key = f"{_month_prefix(created_date.year, created_date.month)}/{filename}"
         else:
             s3_key = f"photos/unknown_date/{filename}"
         
         return s3_key
     
-    def copy_to_local(self, temp_file: str, filename: str, created_date: Optional[datetime] = None) -> bool:
+    def _local_target(self, filename: str, created_date: Optional[datetime] = None) -> Optional[str]:
+        """Path a photo occupies in the local backup tree (same layout as S3)."""
+        if not self.local_path:
+            return None
+        if created_date:
+            year = created_date.year
+            month = f"{created_date.month:02d}"
+            local_dir = os.path.join(self.local_path, "photos", str(year), month)
+        else:
+            local_dir = os.path.join(self.local_path, "photos", "unknown_date")
+        return os.path.join(local_dir, filename)
+
+    def copy_to_local(self, temp_file: str, filename: str, created_date: Optional[datetime] = None,
+                      file_hash: Optional[str] = None) -> bool:
         """Copy file to local backup directory with same folder structure as S3."""
         if not self.local_path:
             return True
-            
+
         try:
-            # Create same folder structure as S3
-            if created_date:
-                year = created_date.year
-                month = f"{created_date.month:02d}"
-                local_dir = os.path.join(self.local_path, "photos", str(year), month)
-            else:
-                local_dir = os.path.join(self.local_path, "photos", "unknown_date")
-            
-            # Create directory if it doesn't exist
-            os.makedirs(local_dir, exist_ok=True)
-            
-            # Copy file to local directory
-            local_file_path = os.path.join(local_dir, filename)
-            
-            # Skip if file already exists locally
+            local_file_path = self._local_target(filename, created_date)
+
+            # Skip if file already exists locally with the right content -
+            # a stale or truncated copy gets replaced
             if os.path.exists(local_file_path):
-                logger.debug(f"File already exists locally: {local_file_path}")
-                return True
-            
+                if file_hash is None or self.get_file_hash(local_file_path) == file_hash:
+                    logger.debug("File already exists locally: %s", local_file_path)
+                    return True
+                logger.info("Local copy differs, replacing: %s", local_file_path)
+
+            # Create directory if it doesn't exist
+            os.makedirs(os.path.dirname(local_file_path), exist_ok=True)
+
             shutil.copy2(temp_file, local_file_path)
-            logger.info(f"Saved locally: {local_file_path}")
+            logger.info("Saved locally: %s", local_file_path)
             return True
             
         except Exception as e:
-            logger.error(f"Failed to save {filename} locally: {e}")
+            logger.error("Failed to save %s locally: %s", filename, e)
             return False
     
-    def download_and_upload_photo(self, photo, temp_dir: str) -> bool:
-        """Download photo from iCloud and upload to S3."""
+    def download_and_upload_photo(self, photo, temp_dir: str) -> Tuple[bool, bool]:
+        """Download photo from iCloud and upload to S3.
+
+        Returns (ok, uploaded); uploaded is True only when an actual S3 PUT
+        happened, as opposed to the photo being skipped as already synced.
+        """
         try:
             # Get original filename or generate one
             filename = getattr(photo, 'filename', f"photo_{photo.id}.jpg")
@@ -307,50 +539,124 @@ class iCloudS3Sync:
             # Create unique identifier for this photo
             photo_id = f"{photo.id}_{filename}"
             
-            # Skip if already processed
-            if photo_id in self.processed_files:
-                logger.debug(f"Skipping already processed: {filename}")
-                return True
-            
-            logger.info(f"Processing: {filename}")
-            
-            # Download photo to temporary file
-            temp_file = os.path.join(temp_dir, filename)
-            
-            # Download the photo data
-            download_response = photo.download()
-            if not download_response:
-                logger.warning(f"Failed to download {filename}")
-                return False
-            
-            # Save to temporary file
-            with open(temp_file, 'wb') as f:
-                f.write(download_response.raw.read())
-            
-            # Calculate file hash
-            file_hash = self.get_file_hash(temp_file)
-            
-            # Generate S3 key
+            # Skip if already processed and unchanged in iCloud; a changed
+            # version marker or size means the photo was edited and needs a
+            # re-sync
+            version = self._photo_version(photo)
+            size = getattr(photo, 'size', None)
+            changed = False
+            cached_hash = None
+            photo_key = _digest_id(photo_id)
+            with self.state_lock:
+                if photo_key in self.processed_files:
+                    cached_version, cached_size, cached_hash = self.photo_versions.get(
+                        photo_key, (None, None, None))
+                    if cached_version is None or (cached_version == version and cached_size == size):
+                        logger.debug("Skipping already processed: %s", filename)
+                        return True, False
+                    changed = True
+            if changed:
+                logger.info("Photo changed in iCloud, re-syncing: %s", filename)
+            
+            logger.info("Processing: %s", filename)
+
+            # Generate S3 key (needs only photo metadata, no download)
             s3_key = self.generate_s3_key(photo, filename)
-            
+
             # Get created date for local storage
             created_date = None
             if hasattr(photo, 'created'):
                 created_date = photo.created
             elif hasattr(photo, 'asset_date'):
                 created_date = photo.asset_date
-            
-            # Check if file already exists in S3
-            if self.file_exists_in_s3(s3_key, file_hash):
-                logger.info(f"File already exists in S3: {s3_key}")
-                self.processed_files.add(photo_id)
+
+            # Without a local backup the temp file is pure overhead: pipe the
+            # iCloud stream straight into S3 instead of download/hash/upload
+            # passes over the same bytes on disk
+            if not self.local_path:
+                if not changed and self.file_exists_in_s3(s3_key):
+                    logger.info("File already exists in S3: %s", s3_key)
+                    self.mark_processed(photo_id, version, size, cached_hash)
+                    return True, False
+
+                download_response = photo.download()
+                if not download_response:
+                    logger.warning("Failed to download %s", filename)
+                    return False, False
+
+                download_response.raw.decode_content = True
+                stream = _HashingStream(download_response.raw)
+
+                # The content hash isn't known until the stream is drained,
+                # so it can't go into the upload metadata; it's recorded in
+                # the sync state after the upload instead
+                metadata = {
+                    'original-filename': filename,
+                    'icloud-id': str(photo.id),
+                    'upload-date': datetime.now().isoformat()
+                }
+                if created_date:
+                    metadata['created-date'] = created_date.isoformat()
+
+                upload_success = self.upload_stream_to_s3(stream, s3_key, metadata)
+                self.hash_seconds += stream.hash_seconds
+                if upload_success:
+                    self.mark_processed(photo_id, version, size, stream.hexdigest())
+                    logger.info("Successfully synced: %s -> %s", filename, s3_key)
+                return upload_success, upload_success
+
+            # Trust the bucket index before paying for a download: if the key
+            # is already in S3 (and the photo hasn't changed in iCloud), the
+            # only work possibly left is the local backup copy
+            if not changed and self.file_exists_in_s3(s3_key):
+                local_file = self._local_target(filename, created_date)
+                if local_file and os.path.exists(local_file):
+                    logger.info("File already exists in S3 and locally: %s", s3_key)
+                    self.mark_processed(photo_id, version, size, cached_hash)
+                    return True, False
+
+            # Download photo to temporary file. iCloud libraries routinely
+            # contain duplicate filenames (IMG_0001.JPG from different devices
+            # or years), and with concurrent workers two of them would clobber
+            # each other's temp file - prefix with the photo digest so every
+            # task writes to its own path.
+            temp_file = os.path.join(temp_dir, f"{photo_key:016x}_{filename}")
+
+            # Download the photo data
+            download_response = photo.download()
+            if not download_response:
+                logger.warning("Failed to download %s", filename)
+                return False, False
+
+            # Stream to the temporary file in 1 MiB chunks - reading .raw in
+            # one go would hold an entire video in memory. Hash as we write
+            # so we don't have to re-read the file from disk afterwards.
+            download_response.raw.decode_content = True
+            hasher = hashlib.blake2b(digest_size=16)
+            hash_time = 0.0
+            with open(temp_file, 'wb') as f:
+                for chunk in iter(lambda: download_response.raw.read(1024 * 1024), b""):
+                    f.write(chunk)
+                    start = time.perf_counter()
+                    hasher.update(chunk)
+                    hash_time += time.perf_counter() - start
+            self.hash_seconds += hash_time
+            file_hash = hasher.hexdigest()
+
+            # Check if file already exists in S3. Objects uploaded via the
+            # streaming path carry no file-hash metadata, so also accept a
+            # match against the hash recorded in our own sync state.
+            if not changed and (self.file_exists_in_s3(s3_key, file_hash)
+                                or (cached_hash == file_hash and self.file_exists_in_s3(s3_key))):
+                logger.info("File already exists in S3: %s", s3_key)
+                self.mark_processed(photo_id, version, size, file_hash)
                 
                 # Still save locally if requested and doesn't exist
                 if self.local_path:
-                    self.copy_to_local(temp_file, filename, created_date)
+                    self.copy_to_local(temp_file, filename, created_date, file_hash)
                 
                 os.remove(temp_file)
-                return True
+                return True, False
             
             # Prepare metadata
             metadata = {
@@ -369,19 +675,19 @@ class iCloudS3Sync:
             # Save locally if requested
             local_success = True
             if self.local_path:
-                local_success = self.copy_to_local(temp_file, filename, created_date)
+                local_success = self.copy_to_local(temp_file, filename, created_date, file_hash)
             
             if upload_success:
-                self.processed_files.add(photo_id)
-                logger.info(f"Successfully synced: {filename} -> {s3_key}")
+                self.mark_processed(photo_id, version, size, file_hash)
+                logger.info("Successfully synced: %s -> %s", filename, s3_key)
                 
             # Clean up temporary file
             os.remove(temp_file)
-            return upload_success and local_success
+            return upload_success and local_success, upload_success
             
         except Exception as e:
-            logger.error(f"Error processing photo {filename}: {e}")
-            return False
+            logger.error("Error processing photo %s: %s", filename, e)
+            return False, False
     
     def sync_photos(self, max_photos: Optional[int] = None) -> Dict[str, int]:
         """Main sync function to download iCloud photos and upload to S3."""
@@ -392,13 +698,21 @@ class iCloudS3Sync:
         
         # Load previous sync state
         self.load_sync_state()
-        
+
         # Get iCloud Photos service
         photos_service = self.icloud.photos
-        
-        # Get all photos
+
+        # Both cold-start costs are pure network waits - iCloud's paged
+        # metadata fetch and the S3 bucket LIST - so overlap them instead of
+        # paying for them back to back. pyicloud fetches album pages lazily as
+        # the iterator advances; list() forces them all here, once, so later
+        # passes over the photos don't re-request them.
         logger.info("Fetching photo list from iCloud...")
-        photos = photos_service.all
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as prefetch:
+            # Index what's already in the bucket so existence checks are dict hits
+            index_future = prefetch.submit(self._index_bucket)
+            photos = list(photos_service.all)
+            index_future.result()
         total_photos = len(photos)
         logger.info(f"Found {total_photos} photos in iCloud Photos")
         
@@ -415,35 +729,84 @@ class iCloudS3Sync:
             'errors': 0
         }
         
-        # Create temporary directory for downloads
-        with tempfile.TemporaryDirectory() as temp_dir:
-            for i, photo in enumerate(photos, 1):
-                logger.info(f"Processing photo {i}/{len(photos)}")
-                
+        # S3 throttles per key prefix, and photos cluster by month - interleave
+        # submission order across photos/YYYY/MM/ prefixes so the in-flight
+        # uploads spread the load instead of stampeding a single month
+        by_prefix = defaultdict(list)
+        for photo in photos:
+            by_prefix[self.generate_s3_key(photo, '')].append(photo)
+        ordered_photos = [
+            photo
+            for batch in itertools.zip_longest(*by_prefix.values())
+            for photo in batch
+            if photo is not None
+        ]
+
+        # Keep small downloads entirely in RAM where possible: /dev/shm is
+        # tmpfs, so the write-then-upload round trip never touches disk.
+        # Large videos go to the regular (disk-backed) temp dir instead.
+        fast_tmp = '/dev/shm' if os.path.isdir('/dev/shm') else None
+        with tempfile.TemporaryDirectory(dir=fast_tmp) as temp_dir, \
+                tempfile.TemporaryDirectory() as overflow_dir:
+            # Each photo is dominated by iCloud download + S3 upload (I/O-bound),
+            # so fan them out across a thread pool instead of processing serially.
+            # asyncio would scale to higher fan-out, but pyicloud and boto3 are
+            # both synchronous, so at the ~16-worker level that matters here
+            # threads give the same wall time without an aiohttp/aioboto3
+            # rewrite; raise SYNC_WORKERS instead if the link has headroom.
+            # Submission is bounded so the temp dir can't fill up with pending files.
+            submit_limit = threading.Semaphore(self.max_workers * 2)
+
+            def process_photo(photo):
                 try:
-                    if self.download_and_upload_photo(photo, temp_dir):
-                        stats['processed'] += 1
-                        if f"{photo.id}_{getattr(photo, 'filename', f'photo_{photo.id}.jpg')}" in self.processed_files:
-                            stats['uploaded'] += 1
-                    else:
+                    size = getattr(photo, 'size', None)
+                    target_dir = overflow_dir if size and size > _LARGE_FILE_BYTES else temp_dir
+                    return self.download_and_upload_photo(photo, target_dir)
+                finally:
+                    submit_limit.release()
+
+            with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                futures = {}
+                for i, photo in enumerate(ordered_photos, 1):
+                    submit_limit.acquire()
+                    futures[executor.submit(process_photo, photo)] = photo
+                    if max_photos and i == max_photos:
+                        logger.info(f"Reached max photos: {max_photos}")
+                        break
+
+                completed = 0
+                total_submitted = len(futures)
+                last_log = 0.0
+                for future in concurrent.futures.as_completed(futures):
+                    photo = futures[future]
+                    completed += 1
+
+                    # One progress line per second is plenty - the logging
+                    # lock is contended under the thread pool
+                    now = time.monotonic()
+                    if now - last_log > 1.0 or completed == total_submitted:
+                        logger.info("Processed %d/%d photos", completed, total_submitted)
+                        last_log = now
+
+                    try:
+                        ok, uploaded = future.result()
+                        if ok:
+                            stats['processed'] += 1
+                            if uploaded:
+                                stats['uploaded'] += 1
+                            else:
+                                stats['skipped'] += 1
+                        else:
+                            stats['errors'] += 1
+
+                    except Exception as e:
+                        logger.error("Error processing photo %s: %s",
+                                     getattr(photo, 'filename', photo.id), e)
                         stats['errors'] += 1
-                        
-                except Exception as e:
-                    logger.error(f"Error processing photo {i}: {e}")
-                    stats['errors'] += 1
-                
-                # Save state periodically
-                if i % 10 == 0:
-                    self.save_sync_state()
-                if max_photos and i == max_photos:
-                    logger.info(f"Reached max photos: {max_photos}")
-                    break
-        
-        # Final save
-        self.save_sync_state()
-        
+
         logger.info("Sync completed!")
         logger.info(f"Statistics: {stats}")
+        logger.info(f"Time spent hashing: {self.hash_seconds:.1f}s")
         
         return stats
 
@@ -468,6 +831,7 @@ Environment Variables:
   AWS_REGION           AWS region (default: us-east-1)
   S3_BUCKET_NAME       Target S3 bucket name
   S3_STORAGE_CLASS     S3 storage class (default: DEEP_ARCHIVE)
+  SYNC_WORKERS         Number of concurrent download/upload workers (default: 16)
         """
     )
     